@@ -2,14 +2,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import CountVectorizer
-import pickle
-import hashlib
+import sqlite3
 import time
+from contextlib import closing
+from dataclasses import dataclass
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 
 st.set_page_config(
     page_title="Cinema Insights",
@@ -37,44 +35,148 @@ def load_data():
         'runtime': [142, 175, 152, 154, 142, 148, 136, 146, 118, 124],
         'revenue': [58.3, 245.1, 1004.6, 213.9, 677.9, 836.8, 463.5, 47.1, 272.7, 538.4]
     })
-    return movies
+    movies = movies.astype({'title': 'string[pyarrow]', 'genre': 'category', 'director': 'category'})
+    genres = movies['genre'].cat
+    index = {
+        'genre_code': genres.codes.to_numpy(np.int8),
+        'year': movies['year'].to_numpy(np.int16),
+        'rating': movies['rating'].to_numpy(np.float32),
+        'genre_codes': {genre.lower(): code for code, genre in enumerate(genres.categories)},
+    }
+    meta = {
+        'year_min': int(movies['year'].min()),
+        'year_max': int(movies['year'].max()),
+        'genres': list(movies['genre'].unique()),
+    }
+    return movies, index, meta
+
+
+password_hasher = PasswordHasher()
 
 
 def make_hashes(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
+    return password_hasher.hash(password)
 
 def check_hashes(password, hashed_text):
-    return make_hashes(password) == hashed_text
+    try:
+        return password_hasher.verify(hashed_text, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
 
+def connect_users_db():
+    conn = sqlite3.connect('users.db')
+    conn.execute("CREATE TABLE IF NOT EXISTS users(name TEXT PRIMARY KEY, hash TEXT)")
+    return conn
 
 def load_users():
-    try:
-        with open('users.pkl', 'rb') as f:
-            users = pickle.load(f)
-    except FileNotFoundError:
-        users = {}
-    return users
-
-def save_users(users):
-    with open('users.pkl', 'wb') as f:
-        pickle.dump(users, f)
-
-def get_recommendations(movies, favorite_genre, min_rating, years_range):
-    filtered_movies = movies[
-        (movies['genre'].str.contains(favorite_genre, case=False)) &
-        (movies['rating'] >= min_rating) &
-        (movies['year'] >= years_range[0]) &
-        (movies['year'] <= years_range[1])
+    with closing(connect_users_db()) as conn:
+        return dict(conn.execute("SELECT name, hash FROM users"))
+
+def save_user(username, hashed_password):
+    with closing(connect_users_db()) as conn:
+        conn.execute("INSERT INTO users VALUES (?, ?)", (username, hashed_password))
+        conn.commit()
+
+@st.cache_resource
+def get_users_store():
+    return load_users()
+
+def match_mask(index, genre, year_lo, year_hi, min_rating):
+    mask = np.greater_equal(index['year'], year_lo)
+    scratch = np.empty_like(mask)
+    mask &= np.less_equal(index['year'], year_hi, out=scratch)
+    mask &= np.greater_equal(index['rating'], np.float32(min_rating), out=scratch)
+    if genre is not None:
+        code = index['genre_codes'].get(genre.lower(), -1)
+        mask &= np.equal(index['genre_code'], code, out=scratch)
+    return mask
+
+EXPLORER_COLUMNS = ['title', 'year', 'genre', 'rating']
+
+@st.cache_data
+def filter_movies(selected_genre, year_lo, year_hi, min_rating):
+    movies, index, _ = load_data()
+    genre = None if selected_genre == "All" else selected_genre
+    mask = match_mask(index, genre, year_lo, year_hi, min_rating)
+    return movies.iloc[np.flatnonzero(mask)][EXPLORER_COLUMNS]
+
+def top_rated(rows, rating, k):
+    scores = rating[rows]
+    if len(rows) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores > kth
+        ties = np.flatnonzero(scores == kth)[:k - np.count_nonzero(keep)]
+        keep[ties] = True
+        rows, scores = rows[keep], scores[keep]
+    return rows[np.argsort(-scores, kind='stable')]
+
+@st.cache_data
+def get_recommendations(favorite_genre, min_rating, years_range):
+    movies, index, _ = load_data()
+    mask = match_mask(index, favorite_genre, years_range[0], years_range[1], min_rating)
+    return movies.iloc[top_rated(np.flatnonzero(mask), index['rating'], 5)]
+
+
+@dataclass(frozen=True)
+class DashboardStats:
+    total_movies: int
+    average_rating: float
+    earliest_year: int
+    latest_year: int
+
+@st.cache_data
+def dashboard_stats():
+    movies, _, meta = load_data()
+    return DashboardStats(
+        total_movies=len(movies),
+        average_rating=float(movies['rating'].mean()),
+        earliest_year=meta['year_min'],
+        latest_year=meta['year_max'],
+    )
+
+def metrics_html(stats):
+    metrics = [
+        ("Total Movies", stats.total_movies),
+        ("Average Rating", f"{stats.average_rating:.1f}"),
+        ("Earliest Year", stats.earliest_year),
+        ("Latest Year", stats.latest_year),
     ]
-    return filtered_movies.sort_values('rating', ascending=False).head(5)
+    cells = "".join(
+        f"<div style='flex: 1'><div style='font-size: 0.875rem'>{label}</div>"
+        f"<div style='font-size: 2.25rem'>{value}</div></div>"
+        for label, value in metrics
+    )
+    return f"<div style='display: flex; gap: 1rem'>{cells}</div>"
+
+@st.cache_resource
+def genre_pie():
+    import plotly.express as px
+
+    movies, _, _ = load_data()
+    genre_counts = movies['genre'].value_counts()
+    return px.pie(values=genre_counts.values, names=genre_counts.index)
+
+@st.cache_resource
+def rating_histogram():
+    import plotly.express as px
+
+    movies, _, _ = load_data()
+    return px.histogram(movies, x='rating', nbins=10)
+
+@st.cache_resource
+def year_rating_scatter():
+    import plotly.express as px
+
+    movies, _, _ = load_data()
+    return px.scatter(movies, x='year', y='rating', size='votes', color='genre',
+                      hover_name='title', log_x=False, size_max=60)
 
 
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 if 'username' not in st.session_state:
     st.session_state.username = None
-if 'users' not in st.session_state:
-    st.session_state.users = load_users()
 
 
 def login_page():
@@ -85,19 +187,19 @@ def login_page():
     username = login_form.text_input("Username")
     password = login_form.text_input("Password", type='password')
     submit = login_form.form_submit_button("Login")
+    users = get_users_store()
     
     if submit:
-        if username in st.session_state.users:
-            if check_hashes(password, st.session_state.users[username]):
-                st.session_state.authenticated = True
-                st.session_state.username = username
-                st.success("Login successful!")
-                time.sleep(1)
-                st.rerun()
-            else:
-                st.error("Incorrect password")
-        else:
+        stored_hash = users.get(username)
+        if stored_hash is None:
             st.error("Username not found")
+        elif check_hashes(password, stored_hash):
+            st.session_state.authenticated = True
+            st.session_state.username = username
+            st.toast("Login successful!")
+            st.rerun()
+        else:
+            st.error("Incorrect password")
     
     st.markdown("---")
     st.markdown("Don't have an account? Register below.")
@@ -108,11 +210,12 @@ def login_page():
     register = register_form.form_submit_button("Register")
     
     if register:
-        if new_username in st.session_state.users:
+        if new_username in users:
             st.error("Username already exists")
         else:
-            st.session_state.users[new_username] = make_hashes(new_password)
-            save_users(st.session_state.users)
+            hashed_password = make_hashes(new_password)
+            save_user(new_username, hashed_password)
+            users[new_username] = hashed_password
             st.success("Registration successful! Please login.")
 
 
@@ -124,36 +227,27 @@ def main_app():
                                    ["Dashboard", "Movie Explorer", "Recommendations", "Your Ratings"])
     
 
-    movies = load_data()
+    movies, _, meta = load_data()
     
     if app_mode == "Dashboard":
         st.title("🎬 Movie Data Dashboard")
         
 
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Total Movies", len(movies))
-        col2.metric("Average Rating", f"{movies['rating'].mean():.1f}")
-        col3.metric("Earliest Year", movies['year'].min())
-        col4.metric("Latest Year", movies['year'].max())
+        st.markdown(metrics_html(dashboard_stats()), unsafe_allow_html=True)
         
   
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Movies by Genre")
-            genre_counts = movies['genre'].value_counts()
-            fig = px.pie(values=genre_counts.values, names=genre_counts.index)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(genre_pie(), use_container_width=True)
             
         with col2:
             st.subheader("Ratings Distribution")
-            fig = px.histogram(movies, x='rating', nbins=10)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(rating_histogram(), use_container_width=True)
         
         st.subheader("Movies by Year and Rating")
-        fig = px.scatter(movies, x='year', y='rating', size='votes', color='genre',
-                         hover_name='title', log_x=False, size_max=60)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(year_rating_scatter(), use_container_width=True)
     
     elif app_mode == "Movie Explorer":
         st.title("🔍 Movie Explorer")
@@ -161,26 +255,19 @@ def main_app():
 
         col1, col2, col3 = st.columns(3)
         with col1:
-            selected_genre = st.selectbox("Filter by Genre", ["All"] + list(movies['genre'].unique()))
+            selected_genre = st.selectbox("Filter by Genre", ["All"] + meta['genres'])
         with col2:
             year_range = st.slider("Year Range", 
-                                  min_value=int(movies['year'].min()), 
-                                  max_value=int(movies['year'].max()),
-                                  value=(int(movies['year'].min()), int(movies['year'].max())))
+                                  min_value=meta['year_min'], 
+                                  max_value=meta['year_max'],
+                                  value=(meta['year_min'], meta['year_max']))
         with col3:
             min_rating = st.slider("Minimum Rating", 0.0, 10.0, 7.0, 0.1)
         
         
-        filtered_movies = movies.copy()
-        if selected_genre != "All":
-            filtered_movies = filtered_movies[filtered_movies['genre'] == selected_genre]
-        filtered_movies = filtered_movies[
-            (filtered_movies['year'] >= year_range[0]) & 
-            (filtered_movies['year'] <= year_range[1]) &
-            (filtered_movies['rating'] >= min_rating)
-        ]
+        filtered_movies = filter_movies(selected_genre, year_range[0], year_range[1], min_rating)
         
-        st.dataframe(filtered_movies, use_container_width=True)
+        st.dataframe(filtered_movies, hide_index=True, use_container_width=True)
     
     elif app_mode == "Recommendations":
         st.title("🎯 Personalized Recommendations")
@@ -189,26 +276,26 @@ def main_app():
         col1, col2 = st.columns(2)
         
         with col1:
-            favorite_genre = st.selectbox("Favorite Genre", movies['genre'].unique())
+            favorite_genre = st.selectbox("Favorite Genre", meta['genres'])
             min_rating = st.slider("Minimum Rating", 0.0, 10.0, 7.5, 0.1)
         
         with col2:
             years_range = st.slider("Release Year Range", 
-                                   min_value=int(movies['year'].min()), 
-                                   max_value=int(movies['year'].max()),
+                                   min_value=meta['year_min'], 
+                                   max_value=meta['year_max'],
                                    value=(1990, 2010))
         
         if st.button("Get Recommendations"):
-            recommendations = get_recommendations(movies, favorite_genre, min_rating, years_range)
+            recommendations = get_recommendations(favorite_genre, min_rating, years_range)
             
             if len(recommendations) > 0:
                 st.success("Here are movies you might enjoy:")
-                for idx, row in recommendations.iterrows():
-                    with st.expander(f"{row['title']} ({row['year']}) - Rating: {row['rating']}"):
-                        st.write(f"**Genre:** {row['genre']}")
-                        st.write(f"**Director:** {row['director']}")
-                        st.write(f"**Runtime:** {row['runtime']} minutes")
-                        st.write(f"**Votes:** {row['votes']:,}")
+                for row in recommendations.itertuples(index=False):
+                    with st.expander(f"{row.title} ({row.year}) - Rating: {row.rating}"):
+                        st.write(f"**Genre:** {row.genre}")
+                        st.write(f"**Director:** {row.director}")
+                        st.write(f"**Runtime:** {row.runtime} minutes")
+                        st.write(f"**Votes:** {row.votes:,}")
             else:
                 st.warning("No movies match your criteria. Try broadening your search.")
     
@@ -216,7 +303,7 @@ def main_app():
         st.title("⭐ Your Ratings")
         
         if 'user_ratings' not in st.session_state:
-            st.session_state.user_ratings = {}
+            st.session_state.user_ratings = []
         
         st.subheader("Rate Movies")
         selected_movie = st.selectbox("Select a movie to rate", movies['title'])
@@ -224,18 +311,18 @@ def main_app():
         review = st.text_area("Your Review (optional)")
         
         if st.button("Submit Rating"):
-            st.session_state.user_ratings[selected_movie] = {
+            st.session_state.user_ratings.append({
+                'movie': selected_movie,
                 'rating': rating,
                 'review': review,
                 'timestamp': time.time()
-            }
+            })
             st.success(f"Thanks for rating {selected_movie}!")
         
         st.subheader("Your Rating History")
         if st.session_state.user_ratings:
-            user_ratings_df = pd.DataFrame.from_dict(st.session_state.user_ratings, orient='index')
-            user_ratings_df['movie'] = user_ratings_df.index
-            st.dataframe(user_ratings_df[['movie', 'rating', 'review']], use_container_width=True)
+            user_ratings_df = pd.DataFrame(st.session_state.user_ratings, columns=['movie', 'rating', 'review'])
+            st.dataframe(user_ratings_df, use_container_width=True)
         else:
             st.info("You haven't rated any movies yet.")
     